@@ -1,172 +1,457 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os, re, argparse, plistlib
+import os, re, sys, json, argparse, plistlib, mmap, bisect, functools, multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    # Optional: RE2 matches big literal alternations in linear time, where
+    # re's backtracking engine degrades with the number of branches.
+    import re2 as re2_engine
+except ImportError:
+    re2_engine = None
+
+try:
+    # Optional: pyahocorasick finds every type name in one C-level pass per
+    # file, independent of how many names there are.
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    # Optional: lxml stream-parses multi-MB storyboards at C speed instead
+    # of regexing the whole file.
+    from lxml import etree
+except ImportError:
+    etree = None
 
 SWIFT_EXT = ('.swift',)
 IB_EXT = ('.storyboard', '.xib')
 PROTECTED_ASSETS = {'AppIcon', 'AccentColor', 'LaunchImage', 'LaunchScreen', 'AppStoreIcon'}
 
-RE_IMAGE_SWIFTUI_SINGLE = re.compile(r'\bImage\s*\(\s*"(.*?)"\s*(?:[,)])')
-RE_COLOR_SWIFTUI_SINGLE = re.compile(r'\bColor\s*\(\s*"(.*?)"\s*(?:[,)])')
-RE_UIIMAGE_NAMED_SINGLE = re.compile(r'\bUIImage\s*\(\s*named\s*:\s*"(.*?)"\s*(?:[,)])')
-RE_UICOLOR_NAMED_SINGLE = re.compile(r'\bUIColor\s*\(\s*named\s*:\s*"(.*?)"\s*(?:[,)])')
+# All content regexes are bytes patterns: the tokens they look for are
+# ASCII, so scanning raw bytes skips the UTF-8 decode of every file and
+# lets finditer run directly over mmap'ed regions. Captured names are
+# decoded individually when they enter the result sets.
+#
+# RE_ASSET_REF is one alternation covering Image/Color/UIImage(named:)/
+# UIColor(named:) in both the plain-string and ternary forms; the plain
+# branch is tried first so Image("x", ...) keeps recording "x".
+RE_ASSET_REF = re.compile(
+    br'\b(?:(?:UIImage|UIColor)\s*\(\s*named\s*:|(?:Image|Color)\s*\()\s*'
+    br'(?:"(?P<s>[^"]*)"\s*[,)]|[^)]*?\?\s*"(?P<a>[^"]*)"\s*:\s*"(?P<b>[^"]*)")')
 
-RE_IMAGE_SWIFTUI_TERNARY = re.compile(r'\bImage\s*\(\s*[^)]*?\?\s*"(.*?)"\s*:\s*"(.*?)"')
-RE_COLOR_SWIFTUI_TERNARY = re.compile(r'\bColor\s*\(\s*[^)]*?\?\s*"(.*?)"\s*:\s*"(.*?)"')
-RE_UIIMAGE_NAMED_TERNARY = re.compile(r'\bUIImage\s*\(\s*named\s*:\s*[^)]*?\?\s*"(.*?)"\s*:\s*"(.*?)"')
-RE_UICOLOR_NAMED_TERNARY = re.compile(r'\bUIColor\s*\(\s*named\s*:\s*[^)]*?\?\s*"(.*?)"\s*:\s*"(.*?)"')
-
-RE_XML_IMAGE_ATTR = re.compile(r'\bimage="([^"]+)"')
-RE_XML_COLOR_NODE = re.compile(r'<color[^>]+name="([^"]+)"')
-RE_TYPE_DECL = re.compile(r'^\s*(?:public|internal|private|open|fileprivate)?\s*(?:final|indirect|actor|class|struct|enum)\s+([A-Za-z_]\w*)', re.MULTILINE)
+RE_XML_ASSET = re.compile(br'\bimage="([^"]+)"|<color[^>]+name="([^"]+)"')
+RE_IDENT = re.compile(br'[A-Za-z_]\w*')
+RE_STRIP = re.compile(br'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\])*"', re.DOTALL)
+RE_TYPE_DECL = re.compile(br'^\s*(?:public|internal|private|open|fileprivate)?\s*(?:final|indirect|actor|class|struct|enum)\s+([A-Za-z_]\w*)', re.MULTILINE)
 
 TEST_DIR_SUFFIXES = ('tests', 'testing', 'specs', 'uitests', 'integrationtests', 'unittests')
 TEST_FILE_SUFFIXES = ('test.swift', 'tests.swift', 'spec.swift', 'specs.swift')
+PLIST_MMAP_MIN = 1 << 20
+SLURP_MMAP_MIN = 1 << 20
+DEFAULT_CACHE_FILE = os.path.join("~", ".cache", "scan_ios_unused.json")
+SCAN_CACHE_VERSION = 1
 ASSET_SUFFIXES = ('.imageset', '.colorset', '.dataset', '.appiconset', '.symbolset', '.iconset', '.cubetexture')
 
-def is_hidden(path):
-    return any(part.startswith('.') for part in path.split(os.sep))
+# abspath walks the string and may hit getcwd; the same paths come through
+# the hot loops repeatedly, so memoize.
+_abspath = functools.lru_cache(maxsize=None)(os.path.abspath)
 
 def is_test_path(path: str) -> bool:
-    p = path.replace('\\', '/')
-    parts = [part.lower() for part in p.split('/')]
+    parts = [part.lower() for part in path.replace('\\', '/').split('/')]
     if any(part in TEST_DIR_SUFFIXES or any(part.endswith(suf) for suf in TEST_DIR_SUFFIXES) for part in parts):
         return True
-    base = os.path.basename(p).lower()
+    base = parts[-1] if parts else ''
     if any(base.endswith(suf) for suf in TEST_FILE_SUFFIXES):
         return True
     return False
 
-def list_source_files(root, exts):
-    for dirpath, _, filenames in os.walk(root):
-        if is_hidden(dirpath):
-            continue
-        for f in filenames:
-            if f.endswith(exts):
-                yield os.path.join(dirpath, f)
-
-def find_xcassets_dirs(root):
-    found = []
-    for dirpath, dirnames, _ in os.walk(root):
-        if is_hidden(dirpath):
+def walk_project(root):
+    # Single traversal of the whole tree: Swift sources, IB files, plists
+    # and asset-catalog entries all come out of one scandir walk. DirEntry
+    # reuses the stat information readdir already returned, so no extra
+    # stat syscall per entry, and entry.path is precomputed — no joins.
+    swift_paths = []
+    ib_paths = []
+    plist_paths = []
+    declared_assets = {}
+    # Catalog membership travels down the stack: a directory is inside a
+    # catalog iff some ancestor's name ends exactly with '.xcassets', same
+    # as the old per-catalog walk (a substring test would also accept the
+    # likes of Design.xcassets.bak).
+    stack = [(root, False)]
+    while stack:
+        dirpath, in_catalog = stack.pop()
+        try:
+            entries = os.scandir(dirpath)
+        except OSError:
             continue
-        for d in dirnames:
-            if d.endswith('.xcassets'):
-                found.append(os.path.join(dirpath, d))
-    return found
+        has_contents_json = False
+        with entries:
+            for entry in entries:
+                name = entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        # Prune hidden trees here so .git and friends are
+                        # never even opened.
+                        if not name.startswith('.'):
+                            stack.append((entry.path, in_catalog or name.endswith('.xcassets')))
+                        continue
+                except OSError:
+                    continue
+                if name.endswith(SWIFT_EXT):
+                    swift_paths.append(entry.path)
+                elif name.endswith(IB_EXT):
+                    ib_paths.append(entry.path)
+                elif name == 'Info.plist':
+                    plist_paths.append(entry.path)
+                elif name == 'Contents.json':
+                    has_contents_json = True
+        if has_contents_json and in_catalog:
+            base = os.path.basename(dirpath)
+            for suf in ASSET_SUFFIXES:
+                if base.endswith(suf):
+                    asset_name = base[:-len(suf)]
+                    if asset_name:
+                        declared_assets.setdefault(asset_name, set()).add(_abspath(dirpath))
+                    break
+    return swift_paths, ib_paths, plist_paths, declared_assets
+
+def strip_code(content):
+    # Blank out comments and collapse string literals so identifier scans
+    # neither see them nor pay to scan their bytes. Asset-reference regexes
+    # keep running on the original content, since the names they want live
+    # inside the string literals.
+    return RE_STRIP.sub(lambda m: b'""' if m.group().startswith(b'"') else b' ', content)
 
 def slurp(path):
+    # Raw bytes, no decode. Big files come back as a read-only mmap so the
+    # regexes walk the OS-mapped pages instead of a heap copy (the mapping
+    # stays valid after the fd is closed).
     try:
-        with open(path, 'r', encoding='utf-8') as f:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size > SLURP_MMAP_MIN:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
             return f.read()
     except Exception:
-        return ""
-
-def collect_declared_assets_with_paths(project_root):
-    declared_paths = {}
-    for catalog in find_xcassets_dirs(project_root):
-        for dirpath, _, filenames in os.walk(catalog):
-            if is_hidden(dirpath):
-                continue
-            base = os.path.basename(dirpath)
-            if any(base.endswith(suf) for suf in ASSET_SUFFIXES):
-                if 'Contents.json' not in filenames:
-                    continue
-                name = None
-                for suf in ASSET_SUFFIXES:
-                    if base.endswith(suf):
-                        name = base[:-len(suf)]
-                        break
-                if name:
-                    declared_paths.setdefault(name, set()).add(os.path.abspath(dirpath))
-    return declared_paths
-
-def collect_referenced_assets(project_root, include_tests=False):
-    referenced = set()
-    for path in list_source_files(project_root, SWIFT_EXT):
-        if (not include_tests) and is_test_path(path):
-            continue
-        c = slurp(path)
-        for rx in (RE_IMAGE_SWIFTUI_SINGLE, RE_COLOR_SWIFTUI_SINGLE,
-                   RE_UIIMAGE_NAMED_SINGLE, RE_UICOLOR_NAMED_SINGLE):
-            for m in rx.finditer(c):
-                val = (m.group(1) or "").strip()
-                if val:
-                    referenced.add(val)
-        for rx in (RE_IMAGE_SWIFTUI_TERNARY, RE_COLOR_SWIFTUI_TERNARY,
-                   RE_UIIMAGE_NAMED_TERNARY, RE_UICOLOR_NAMED_TERNARY):
-            for m in rx.finditer(c):
-                a = (m.group(1) or "").strip()
-                b = (m.group(2) or "").strip()
-                if a: referenced.add(a)
-                if b: referenced.add(b)
-    for path in list_source_files(project_root, IB_EXT):
-        c = slurp(path)
-        for m in RE_XML_IMAGE_ATTR.finditer(c):
-            referenced.add(m.group(1).strip())
-        for m in RE_XML_COLOR_NODE.finditer(c):
-            referenced.add(m.group(1).strip())
-    for dirpath, _, filenames in os.walk(project_root):
-        if is_hidden(dirpath):
+        return b""
+
+def collect_declared_assets_with_paths(project_root, walk=None):
+    if walk is None:
+        walk = walk_project(project_root)
+    return walk[3]
+
+def scan_pool():
+    # I/O-bound slurps overlap nicely; re also releases the GIL in spots.
+    return ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+
+def asset_refs_in(c):
+    refs = set()
+    # Cheap substring probe before any regex work; most files reference
+    # no assets at all ('Image' also covers 'UIImage', same for colors).
+    if c.find(b'Image') < 0 and c.find(b'Color') < 0:
+        return refs
+    for m in RE_ASSET_REF.finditer(c):
+        s = m.group('s')
+        if s is not None:
+            s = s.decode('utf-8', 'replace').strip()
+            if s:
+                refs.add(s)
             continue
-        for f in filenames:
-            if f == 'Info.plist':
-                try:
-                    with open(os.path.join(dirpath, f), 'rb') as fp:
-                        pl = plistlib.load(fp)
-                    for n in (pl.get('CFBundleIconFiles') or []):
-                        if isinstance(n, str): referenced.add(n)
-                    ls = pl.get('UILaunchStoryboardName')
-                    if isinstance(ls, str): referenced.add(ls)
-                except Exception:
-                    pass
-    return referenced
+        a = (m.group('a') or b'').decode('utf-8', 'replace').strip()
+        b = (m.group('b') or b'').decode('utf-8', 'replace').strip()
+        if a: refs.add(a)
+        if b: refs.add(b)
+    return refs
+
+def load_scan_cache(cache_path):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == SCAN_CACHE_VERSION:
+            return data.get('files', {})
+    except Exception:
+        pass
+    return {}
 
-def collect_types_by_file(project_root, include_tests=False):
+def save_scan_cache(cache_path, files):
+    try:
+        # A bare filename has no directory component; makedirs('') raises.
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': SCAN_CACHE_VERSION, 'files': files}, f)
+    except Exception:
+        pass
+
+def ib_asset_refs(path):
+    refs = set()
+    if etree is not None:
+        try:
+            # Stream-parse: attributes are read element by element and each
+            # finished element is cleared, so memory stays bounded even for
+            # multi-MB storyboards.
+            for _, el in etree.iterparse(path, events=('end',), recover=True):
+                img = el.get('image')
+                if img:
+                    refs.add(img.strip())
+                if el.tag == 'color':
+                    n = el.get('name')
+                    if n:
+                        refs.add(n.strip())
+                el.clear()
+            return refs
+        except Exception:
+            refs.clear()
+    c = slurp(path)
+    for m in RE_XML_ASSET.finditer(c):
+        v = m.group(1) or m.group(2)
+        refs.add(v.decode('utf-8', 'replace').strip())
+    return refs
+
+def scan_swift_file(path):
+    content = slurp(path)
+    # Intern the names: the same identifiers are hashed over and over in
+    # the sets/dicts downstream, and interned strings compare by pointer.
+    decls = [sys.intern(m.group(1).decode('utf-8', 'replace')) for m in RE_TYPE_DECL.finditer(content)]
+    return path, asset_refs_in(content), decls
+
+def scan_project(project_root, include_tests=False, walk=None, cache_path=None):
+    # Asset references and type declarations come out of the same pass, and
+    # each file's content is dropped as soon as it is scanned. With a cache
+    # path, per-file results are keyed on (mtime, size) so repeated runs
+    # over a mostly-unchanged tree only re-scan what actually changed.
+    if walk is None:
+        walk = walk_project(project_root)
+    prev = load_scan_cache(cache_path) if cache_path else {}
+    stats = {}
+    results = []
+    to_scan = []
+    for path in walk[0]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        stats[path] = st
+        ent = prev.get(path)
+        if st is not None and ent is not None and ent[0] == st.st_mtime and ent[1] == st.st_size:
+            results.append((path, set(ent[2]), [sys.intern(t) for t in ent[3]]))
+        else:
+            to_scan.append(path)
+    if len(to_scan) >= PROCESS_MIN_FILES:
+        # CPU-bound regex work scales with processes; scan_swift_file opens
+        # the file in the child and only the small result tuples cross the
+        # pipe. chunksize amortizes the IPC round-trips.
+        with multiprocessing.Pool(os.cpu_count()) as pool:
+            results.extend(pool.map(scan_swift_file, to_scan, chunksize=SCAN_BATCH_FILES))
+    else:
+        with scan_pool() as ex:
+            results.extend(ex.map(scan_swift_file, to_scan))
+
+    referenced = set()
     types_by_file = {}
-    for path in list_source_files(project_root, SWIFT_EXT):
-        if (not include_tests) and is_test_path(path):
-            continue
-        decls = [m.group(1) for m in RE_TYPE_DECL.finditer(slurp(path))]
-        if decls:
-            types_by_file[path] = decls
-    return types_by_file
-
-def collect_all_swift_contents(project_root, include_tests=False):
-    contents = {}
-    for path in list_source_files(project_root, SWIFT_EXT):
-        if (not include_tests) and is_test_path(path):
-            continue
-        contents[path] = slurp(path)
-    return contents
+    fresh = {}
+    for path, refs, decls in results:
+        st = stats[path]
+        if st is not None:
+            fresh[path] = [st.st_mtime, st.st_size, sorted(refs), decls]
+        if include_tests or not is_test_path(path):
+            referenced |= refs
+            if decls:
+                types_by_file[path] = decls
+    if cache_path:
+        save_scan_cache(cache_path, fresh)
+    return referenced, types_by_file
+
+def collect_referenced_assets(project_root, include_tests=False, scan=None, walk=None):
+    if walk is None:
+        walk = walk_project(project_root)
+    if scan is None:
+        scan = scan_project(project_root, include_tests, walk=walk)
+    referenced = set(scan[0])
+    for path in walk[1]:
+        referenced |= ib_asset_refs(path)
+    for path in walk[2]:
+        try:
+            # Probe the raw bytes first; most Info.plists carry neither key
+            # and parsing them (binary plists included) is pure waste. Large
+            # plists get probed through mmap so the bytes are never copied.
+            with open(path, 'rb') as fp:
+                if os.fstat(fp.fileno()).st_size > PLIST_MMAP_MIN:
+                    with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if mm.find(b'CFBundleIconFiles') < 0 and mm.find(b'UILaunchStoryboardName') < 0:
+                            continue
+                        data = mm[:]
+                else:
+                    data = fp.read()
+                    if b'CFBundleIconFiles' not in data and b'UILaunchStoryboardName' not in data:
+                        continue
+            pl = plistlib.loads(data)
+            for n in (pl.get('CFBundleIconFiles') or []):
+                if isinstance(n, str): referenced.add(n)
+            ls = pl.get('UILaunchStoryboardName')
+            if isinstance(ls, str): referenced.add(ls)
+        except Exception:
+            pass
+    return referenced
+
+def collect_types_by_file(project_root, include_tests=False, scan=None):
+    if scan is None:
+        scan = scan_project(project_root, include_tests)
+    return scan[1]
+
+WORD_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_')
+
+def build_type_automaton(types):
+    if ahocorasick is None:
+        return None
+    auto = ahocorasick.Automaton()
+    for t in types:
+        auto.add_word(t, t)
+    auto.make_automaton()
+    return auto
 
-def find_unused_swift_files(project_root, include_tests=False, keep_names=None, keep_regexes=None):
+def standalone_hit(text, end, length):
+    # Aho-Corasick reports substring hits; reject the ones embedded in a
+    # longer identifier, mirroring the \b...\b regexes.
+    start = end - length + 1
+    if start > 0 and text[start - 1] in WORD_CHARS:
+        return False
+    nxt = end + 1
+    return nxt >= len(text) or text[nxt] not in WORD_CHARS
+
+TYPE_RX_CHUNK = 1000
+# Files per scanning batch: contents are joined with a sentinel and scanned
+# in one go, amortizing the per-file kernel dispatch.
+SCAN_BATCH_FILES = 64
+# Below this many files the fork/spawn and IPC cost of a process pool
+# outweighs the GIL relief; stay on threads.
+PROCESS_MIN_FILES = 256
+# The sentinel contains no identifier characters, so \b and the automaton's
+# boundary check both treat file joins as hard breaks.
+SCAN_SENTINEL = b'\n\0\n'
+
+def compile_type_regexes(types):
+    # The type alternation is pure escaped literals plus \b, which RE2
+    # handles; the fancier asset regex stays on re. Chunk the names per
+    # pattern since re chokes on huge alternations.
+    engine = re2_engine or re
+    names = [re.escape(t.encode('utf-8')) for t in types]
+    return [engine.compile(br'\b(?:' + b'|'.join(names[i:i + TYPE_RX_CHUNK]) + br')\b')
+            for i in range(0, len(names), TYPE_RX_CHUNK)]
+
+# Per-worker state for the usage scan; set up by init_usage_scanner, which
+# runs as the process-pool initializer (or once in-process on small trees).
+_usage_automaton = None
+_usage_regexes = None
+_usage_tokens = None
+
+def init_usage_scanner(types):
+    global _usage_automaton, _usage_regexes, _usage_tokens
+    _usage_automaton = build_type_automaton(types)
+    _usage_regexes = None if _usage_automaton is not None else compile_type_regexes(types)
+    _usage_tokens = {t.encode('utf-8') for t in types}
+
+def usage_batch_hits(batch):
+    # Slurp each file in the batch, strip comments/strings, join the
+    # contents around a sentinel and run the kernel once over the whole
+    # blob; a bisect over cumulative offsets maps each hit back to its
+    # file. Memory stays bounded by the batch, contents are discarded on
+    # return, and test files always take part so test-only usage still
+    # counts as "used".
+    contents = [strip_code(slurp(p)) for p in batch]
+    hits = []
+    if _usage_automaton is not None:
+        # One linear pass emits every type hit at once; the bindings
+        # want text, so decode per file (offsets are computed in the
+        # decoded domain to stay aligned with the scan).
+        parts = [c.decode('utf-8', 'replace') for c in contents]
+        offsets = []
+        pos = 0
+        for part in parts:
+            offsets.append(pos)
+            pos += len(part) + len(SCAN_SENTINEL)
+        joined = SCAN_SENTINEL.decode('ascii').join(parts)
+        for end, t in _usage_automaton.iter(joined):
+            if standalone_hit(joined, end, len(t)):
+                hits.append((batch[bisect.bisect_right(offsets, end) - 1], sys.intern(t)))
+        return hits
+    joined = SCAN_SENTINEL.join(contents)
+    # Tokenize once and intersect; only batches mentioning at least one
+    # candidate name get the precise word-boundary scan.
+    if _usage_tokens.isdisjoint(RE_IDENT.findall(joined)):
+        return hits
+    offsets = []
+    pos = 0
+    for c in contents:
+        offsets.append(pos)
+        pos += len(c) + len(SCAN_SENTINEL)
+    for rx in _usage_regexes:
+        for m in rx.finditer(joined):
+            t = sys.intern(m.group(0).decode('utf-8', 'replace'))
+            hits.append((batch[bisect.bisect_right(offsets, m.start()) - 1], t))
+    return hits
+
+def find_unused_swift_files(project_root, include_tests=False, keep_names=None, keep_regexes=None, scan=None, walk=None):
     keep_names = set(keep_names or [])
-    keep_regexes = [re.compile(r) for r in (keep_regexes or [])]
-    types_by_file = collect_types_by_file(project_root, include_tests)
+    # One union pattern instead of N compiled regexes probed per type name.
+    # Arbitrary user patterns don't always survive being joined: inline
+    # flags like (?i) are only legal at the start of a whole expression,
+    # and numbered backreferences break when the union renumbers groups.
+    # In those cases fall back to probing each pattern separately.
+    keep_union = None
+    keep_list = []
+    if keep_regexes:
+        if any(re.search(r'\\[1-9]', r) for r in keep_regexes):
+            keep_list = [re.compile(r) for r in keep_regexes]
+        else:
+            try:
+                keep_union = re.compile('|'.join(f'(?:{r})' for r in keep_regexes))
+            except re.error:
+                keep_list = [re.compile(r) for r in keep_regexes]
+
+    def kept(t):
+        if t in keep_names:
+            return True
+        if keep_union is not None and keep_union.search(t):
+            return True
+        return any(rx.search(t) for rx in keep_list)
+    if walk is None:
+        walk = walk_project(project_root)
+    if scan is None:
+        scan = scan_project(project_root, include_tests, walk=walk)
+    types_by_file = scan[1]
     if not types_by_file:
         return []
-    ref_contents = collect_all_swift_contents(project_root, include_tests=True)
-    files_for_refs = list(ref_contents.keys())
-    unused = []
-    for file_path, decls in types_by_file.items():
-        if any(t in keep_names or any(rx.search(t) for rx in keep_regexes) for t in decls):
-            continue
-        referenced_somewhere = False
-        for t in decls:
-            rx = re.compile(r'\b' + re.escape(t) + r'\b')
-            for other in files_for_refs:
-                if other == file_path:
-                    continue
-                if rx.search(ref_contents.get(other, "")):
-                    referenced_somewhere = True
-                    break
-            if referenced_somewhere:
-                break
-        if not referenced_somewhere:
-            unused.append(file_path)
-    return sorted(unused)
+    types = sorted({t for decls in types_by_file.values() for t in decls})
+    type_to_files = {t: set() for t in types}
+    usage_paths = walk[0]
+    batches = [usage_paths[i:i + SCAN_BATCH_FILES]
+               for i in range(0, len(usage_paths), SCAN_BATCH_FILES)]
+    if len(usage_paths) >= PROCESS_MIN_FILES:
+        # Each worker builds its own automaton/regexes once via the
+        # initializer; only paths go out and small (path, type) hit lists
+        # come back over the pipe.
+        with multiprocessing.Pool(os.cpu_count(), initializer=init_usage_scanner,
+                                  initargs=(types,)) as pool:
+            all_hits = pool.map(usage_batch_hits, batches)
+    else:
+        init_usage_scanner(types)
+        with scan_pool() as ex:
+            all_hits = list(ex.map(usage_batch_hits, batches))
+    for hits in all_hits:
+        for path, t in hits:
+            type_to_files[t].add(path)
+    # A file is unused iff none of its declarations is kept and none is
+    # seen outside the declaring file — pure C-level set arithmetic from
+    # here on, no re-scanning of contents.
+    return sorted(
+        fp for fp, decls in types_by_file.items()
+        if not any(kept(t) for t in decls)
+        and not any(type_to_files[t] - {fp} for t in decls)
+    )
 
 def main():
     ap = argparse.ArgumentParser(description="Scanner for unused assets and Swift files.")
@@ -176,40 +461,50 @@ def main():
     ap.add_argument("--protect", nargs='*', default=[], help="Assets to protect")
     ap.add_argument("--keep", nargs='*', default=[], help="Type names to keep")
     ap.add_argument("--keep-regex", nargs='*', default=[], help="Regex of types to keep")
+    ap.add_argument("--cache-file", default=DEFAULT_CACHE_FILE, help="On-disk scan cache location")
+    ap.add_argument("--no-cache", action="store_true", help="Re-scan every file, ignoring the cache")
     args = ap.parse_args()
 
     root = os.path.abspath(args.path)
     out_dir = os.path.abspath(args.output_dir)
     os.makedirs(out_dir, exist_ok=True)
 
-    declared_paths = collect_declared_assets_with_paths(root)
+    cache_path = None if args.no_cache else os.path.expanduser(args.cache_file)
+    walk = walk_project(root)
+    scan = scan_project(root, include_tests=args.include_tests, walk=walk, cache_path=cache_path)
+    declared_paths = collect_declared_assets_with_paths(root, walk=walk)
     declared_names = set(declared_paths.keys())
-    referenced = collect_referenced_assets(root, include_tests=args.include_tests)
+    referenced = collect_referenced_assets(root, include_tests=args.include_tests, scan=scan, walk=walk)
     protected = set(PROTECTED_ASSETS) | set(args.protect)
     unused_asset_names = sorted(a for a in declared_names if a not in referenced and a not in protected)
 
     unused_assets_paths = []
     for name in unused_asset_names:
         for p in sorted(declared_paths.get(name, [])):
-            unused_assets_paths.append(os.path.abspath(p))
+            unused_assets_paths.append(_abspath(p))
 
     unused_swift = find_unused_swift_files(
         root,
         include_tests=args.include_tests,
         keep_names=args.keep,
-        keep_regexes=args.keep_regex
+        keep_regexes=args.keep_regex,
+        scan=scan,
+        walk=walk
     )
 
     ua_path = os.path.join(out_dir, "unused_assets.txt")
     us_path = os.path.join(out_dir, "unused_swift_files.txt")
 
     with open(ua_path, "w", encoding="utf-8") as f:
-        for p in unused_assets_paths:
-            f.write(p + "\n")
+        f.write("\n".join(unused_assets_paths))
+        if unused_assets_paths:
+            f.write("\n")
 
+    unused_swift_abs = [_abspath(p) for p in unused_swift]
     with open(us_path, "w", encoding="utf-8") as f:
-        for p in unused_swift:
-            f.write(os.path.abspath(p) + "\n")
+        f.write("\n".join(unused_swift_abs))
+        if unused_swift_abs:
+            f.write("\n")
 
     print("Reports generated:")
     print(f"- Unused assets: {ua_path}")